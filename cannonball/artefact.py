@@ -2,7 +2,7 @@ from .node import Node
 
 
 class Artefact(Node):
-    @property
-    def marker(self) -> str:
-        """Get the marker for the node."""
-        return "A" if self._completed else "a"
+    __slots__ = ()
+
+    # open, completed, blocked (and the invalid blocked + completed state)
+    _markers = ("a", "A", "a", "a")
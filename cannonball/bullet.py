@@ -7,6 +7,8 @@ class Bullet(Node):
     cannot be manually changed. They are for grouping tasks together and regular thoughts. They still
     propagate their chilren states to the parent."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         name: str,
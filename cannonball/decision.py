@@ -5,6 +5,14 @@ from .node import Node
 class Decision(Node):
     """Decision nodes represent forks in the road."""
 
+    __slots__ = ("_decision", "_options", "_option_ids", "_auto_decide", "_valid_options")
+
+    # open, completed, blocked (and the invalid blocked + completed state)
+    _markers = ("d", "D", "$", "$")
+
+    # a decision is reset when the decided option is blocked or detached, even if only for a moment
+    _eager_state = True
+
     def __init__(
         self,
         name: str,
@@ -18,31 +26,27 @@ class Decision(Node):
         **kwargs,
     ):
         self._decision = None
-        self._options = options
+        self._store_options(options)
         self._auto_decide = auto_decide
+        self._valid_options = None
 
         super().__init__(name, id, parent, children, **kwargs)
-        self._recompute_state()
+        # attaching children already derived the state
+        if not self._children:
+            self._recompute_state()
 
     @property
     def decision(self) -> Optional[Node]:
         """Get the decision node."""
+        self._ensure_clean()
         return self._decision
 
     @property
     def is_decided(self) -> bool:
         """Check if the decision has been made."""
+        self._ensure_clean()
         return self._decision is not None
 
-    @property
-    def marker(self) -> str:
-        """Get the marker for the node."""
-        if self._blocked:
-            return "$"
-        if self._completed:
-            return "D"
-        return "d"
-
     @property
     def auto_decide(self) -> bool:
         return self._auto_decide
@@ -63,9 +67,15 @@ class Decision(Node):
         Args:
             options (list[Node]): List of option nodes.
         """
-        self._options = options
+        self._store_options(options)
+        self._valid_options = None
         self._recompute_state()
 
+    def _store_options(self, options: Optional[list[Node]]):
+        """Store the options, and their ids to check whether a node is one of them without scanning the list."""
+        self._options = options
+        self._option_ids = {id(option) for option in options} if options else None
+
     def get_options(self, include_blocked: bool = False) -> list[Node]:
         """Returns all options of the decision, optionally including blocked ones.
         Args:
@@ -73,11 +83,31 @@ class Decision(Node):
         Returns:
             list[Node]: List of options, including blocked ones if specified.
         """
-        options = self._options or self.children
-
         if include_blocked:
-            return options
-        return [n for n in options if not n.is_blocked]
+            return self._options or self.children
+        self._ensure_clean()
+        return list(self._get_valid_options())
+
+    def _get_valid_options(self) -> list[Node]:
+        """Returns the non-blocked options, cached until the next state recomputation.
+
+        Returns:
+            list[Node]: List of non-blocked options. Must not be modified by the caller.
+        """
+        valid_options = self._valid_options
+        if valid_options is None:
+            valid_options = [n for n in (self._options or self._children) if not n.is_blocked]
+            # Children notify this decision of state changes, which invalidates the cache. Options set with
+            # set_options() don't, so their state is checked on every call.
+            if not self._options:
+                self._valid_options = valid_options
+        return valid_options
+
+    def _is_valid_option(self, node: Node) -> bool:
+        """Check whether a node is a non-blocked option, without scanning the children for it."""
+        if self._options:
+            return id(node) in self._option_ids and not node.is_blocked
+        return node.parent is self and not node.is_blocked
 
     def decide(self, decision: Optional[Node]) -> bool:
         """Set the decision node to a specific node from the available options. Cannot be set to a blocked option.
@@ -87,26 +117,35 @@ class Decision(Node):
         Returns:
             bool: True if the decision was set successfully, False otherwise.
         """
+        self._ensure_clean()
         # when we manually decide, set auto_decide to False
         self.auto_decide = False
         if decision == self._decision:
             return False
+        # let _recompute_state derive the completed state, so that it can detect the change and notify the parent
         if decision is None:
             self._decision = None
-            self._completed = False
             self._recompute_state()
-        if decision in self.get_options():
+            return False
+        if self._is_valid_option(decision):
             self._decision = decision
-            self._completed = True
             self._recompute_state()
             return True
         return False
 
-    def _recompute_state(self, notify=True):
+    def _recompute_state(self, notify: bool = True):
         """Recompute the state of the decision node."""
 
-        # Get all options
-        valid_options = self.get_options(include_blocked=False)
+        if not self._options and not self._children:
+            # fast path: without any options, the decision is blocked
+            self._valid_options = []
+            self._decision = None
+            self._update_state(False, True, notify)
+            return
+
+        # Get all options, the state of the options may have changed
+        self._valid_options = None
+        valid_options = self._get_valid_options()
 
         # Reset invalid decision
         if self._decision and self._decision not in valid_options:
@@ -132,11 +171,4 @@ class Decision(Node):
                     self._decision = None
                     is_completed = False
 
-        # Update states
-        if self._completed != is_completed or self._blocked != is_blocked:
-            self._completed = is_completed
-            self._blocked = is_blocked
-
-            # Notify parent if needed
-            if notify:
-                self._notify_parent()
+        self._update_state(is_completed, is_blocked, notify)
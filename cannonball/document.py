@@ -5,7 +5,6 @@ from marko.block import List
 from marko.md_renderer import MarkdownRenderer
 
 from cannonball.node import Node
-from cannonball.utils import walk_list_items
 
 
 class Document:
@@ -34,23 +33,7 @@ class Document:
         list_to_roots = {}
 
         for lst in self.toplevel_lists:
-            item_to_node = {}
-
-            for li, parent_li, level in walk_list_items(lst):
-                if li in item_to_node:
-                    node = item_to_node[li]
-                else:
-                    node = Node.from_list_item(li)
-                    item_to_node[li] = node
-
-                # parent node must already exist since we're parsing a tree
-                parent = item_to_node[parent_li] if parent_li else None
-
-                if parent:
-                    node.parent = parent
-
-            roots = [node for node in item_to_node.values() if node.is_root]
-            list_to_roots[lst] = roots
+            list_to_roots[lst] = Node._from_ast(lst)
 
         return list_to_roots
 
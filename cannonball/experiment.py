@@ -2,11 +2,7 @@ from .node import Node
 
 
 class Experiment(Node):
-    @property
-    def marker(self) -> str:
-        """Get the marker for the node."""
-        if self._blocked:
-            return "%"
-        if self._completed:
-            return "E"
-        return "e"
+    __slots__ = ()
+
+    # open, completed, blocked (and the invalid blocked + completed state)
+    _markers = ("e", "E", "%", "%")
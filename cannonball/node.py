@@ -1,23 +1,53 @@
-from anytree import NodeMixin, find
-from typing import Optional, Tuple, Union
+from bisect import bisect_left
+from typing import Iterator, Optional, Tuple, Union
 from textwrap import dedent
 from marko import Markdown
 from marko.block import ListItem, Paragraph
+from marko.element import Element
 from marko.inline import RawText
-import uuid
-
-from cannonball.utils import (
-    extract_node_marker_and_refs,
-    extract_str_content,
-    get_raw_text_from_listtem,
-    walk_list_items,
-)
+import itertools
+import weakref
+
+from cannonball.utils import extract_marker_and_content, get_raw_text_from_listtem
+
+
+class Node:
+    """Stateful node with state propagation and resolution logic.
+
+    Nodes form a tree. Children are held in a plain list, and each node holds a reference to its parent, so a
+    subtree keeps its ancestors alive.
+
+    State changes propagate lazily: a changed node only marks its ancestors dirty, and a dirty node recomputes its
+    state from its children the next time the state is read. A dirty node's ancestors are always dirty as well.
+    The result must not depend on when the state is read, so state that depends on earlier states is derived
+    right away: a node about to lose its last child first derives the state it keeps as a leaf, and node types
+    with `_eager_state` recompute as soon as a child changes.
+    """
+
+    __slots__ = (
+        "_name",
+        "id",
+        "list_item",
+        "_parent",
+        "_children",
+        "_completed",
+        "_blocked",
+        "_marker",
+        "_dirty",
+        "_name_index",
+        "__weakref__",
+    )
 
+    _node_registry = {}
 
-class Node(NodeMixin):
-    """Stateful node with state propagation and resolution logic."""
+    # Markers of the node type, indexed by (blocked << 1) | completed. If None, the marker passed to the constructor
+    # is used. Overridden by subclasses.
+    _markers: Optional[tuple[str, str, str, str]] = None
 
-    _node_registry = {}
+    # Whether the state of this node type depends on its earlier states, not only on the current state of its
+    # children. Such nodes recompute their state as soon as a child changes instead of when it is read next.
+    # Overridden by subclasses.
+    _eager_state = False
 
     def __init__(
         self,
@@ -34,11 +64,17 @@ class Node(NodeMixin):
         if blocked and completed:
             raise ValueError("A node cannot be both blocked and completed.")
 
+        self._parent = None
+        # most nodes are leaves, they share the empty tuple until their first child is attached
+        self._children = ()
         self._blocked = blocked
         self._completed = completed
         self._marker = marker
+        self._dirty = False
+        self._name_index = None
         self.name = name
         self.id = id
+        self.list_item = None
         self.parent = parent
         if list_item:
             assert isinstance(list_item, ListItem), "Expected a ListItem"
@@ -46,25 +82,147 @@ class Node(NodeMixin):
         if children:
             self.children = children
 
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @name.setter
+    def name(self, value: str):
+        self._name = value
+        self._invalidate_name_indices()
+
+    @property
+    def parent(self) -> Optional["Node"]:
+        """The parent node, or None for root nodes."""
+        return self._parent
+
+    @parent.setter
+    def parent(self, value: Optional["Node"]):
+        current = self.parent
+        if current is value:
+            return
+        # a loop is only possible if the new parent is this node or one of its descendants
+        if value is not None and (value is self or self._children):
+            self._check_loop(value)
+        if current is not None:
+            if current._dirty and len(current._children) == 1:
+                # a leaf keeps its last derived state, derive it from the children it still has
+                current._refresh_state()
+            current._children.remove(self)
+            self._parent = None
+            current._invalidate_name_indices()
+            current._children_changed()
+        if value is not None:
+            value._add_child(self)
+            self._parent = value
+            value._invalidate_name_indices()
+            value._children_changed()
+
+    @property
+    def children(self) -> tuple["Node", ...]:
+        """All child nodes. Assigning an iterable of nodes replaces the children."""
+        return tuple(self._children)
+
+    @children.setter
+    def children(self, children):
+        children = tuple(children)
+        if len({id(child) for child in children}) != len(children):
+            raise ValueError("Cannot add a node multiple times as child.")
+        for child in children:
+            if child is self or child._children:
+                child._check_loop(self)
+
+        # each change only marks this node dirty, it is recomputed once when its state is read next
+        for child in tuple(self._children):
+            child.parent = None
+        for child in children:
+            child.parent = self
+
+    @children.deleter
+    def children(self):
+        self.children = ()
+
+    @property
+    def is_root(self) -> bool:
+        return self.parent is None
+
+    @property
+    def is_leaf(self) -> bool:
+        return not self._children
+
+    def iter_preorder(self) -> Iterator["Node"]:
+        """Iterate over this node and all its descendants in pre-order."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node._children))
+
+    def iter_postorder(self) -> Iterator["Node"]:
+        """Iterate over all descendants of this node and the node itself in post-order (children first)."""
+        stack = [(self, False)]
+        while stack:
+            node, visited = stack.pop()
+            if visited or not node._children:
+                yield node
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node._children))
+
+    def _attach_silent(self, parent: "Node"):
+        """Attach this root node as last child of `parent` without recomputing any state or name index.
+
+        Used while building a tree from parsed markdown, where the states are recomputed once afterwards with
+        `_recompute_subtree()`, and the name indices are dropped with `_invalidate_name_indices()` on the root.
+        """
+        assert self._parent is None, "Only root nodes can be attached silently"
+        parent._add_child(self)
+        self._parent = parent
+
+    def _add_child(self, child: "Node"):
+        """Append `child` to the children list, which is only allocated for the first child."""
+        if self._children:
+            self._children.append(child)
+        else:
+            self._children = [child]
+
+    def _check_loop(self, parent: "Node"):
+        """Raise a ValueError if attaching to `parent` would create a loop."""
+        node = parent
+        while node is not None:
+            if node is self:
+                raise ValueError("Cannot set parent. A node cannot be its own ancestor.")
+            node = node.parent
+
     @property
     def is_completed(self) -> bool:
+        if self._dirty:
+            self._refresh_state()
         return self._completed
 
     @property
     def is_blocked(self) -> bool:
+        if self._dirty:
+            self._refresh_state()
         return self._blocked
 
     @property
     def marker(self) -> str:
         """Get the marker for the node."""
-        return self._marker
+        if self._dirty:
+            self._refresh_state()
+        markers = self._markers
+        if markers is None:
+            return self._marker
+        return markers[(self._blocked << 1) | self._completed]
 
     def __repr__(self):
-        return f"{self.__class__.__name__}({self.name}, completed={self._completed}, blocked={self._blocked})"
+        return f"{self.__class__.__name__}({self.name}, completed={self.is_completed}, blocked={self.is_blocked})"
 
     def __str__(self):
-        if self.marker:
-            return f"[{self.marker}] {self.name}"
+        marker = self.marker
+        if marker:
+            return f"[{marker}] {self.name}"
         return f"{self.name}"
 
     @classmethod
@@ -80,21 +238,19 @@ class Node(NodeMixin):
         cls._node_registry[marker] = (node_class, completed, blocked)
 
     def _update_list_items(self):
-        """Update the list item with the current node's attributes, ignoring its children"""
-
-        # find the RawText node in the list item (inside Paragraph)
-        # and update its text with the current node's attributes
-        if self.list_item:
-            try:
-                paragraph = next(el for el in self.list_item.children if isinstance(el, Paragraph))
-                raw_text = next(el for el in paragraph.children if isinstance(el, RawText))
-                raw_text.children = str(self)
-            except StopIteration:
-                # If no paragraph or raw text found, do nothing
-                pass
-        # Recursively update list items for all children
-        for child in self.children:
-            child._update_list_items()
+        """Update the list items of the node and all its descendants with their current attributes."""
+
+        for node in self.iter_preorder():
+            # find the RawText node in the list item (inside Paragraph)
+            # and update its text with the current node's attributes
+            if node.list_item:
+                try:
+                    paragraph = next(el for el in node.list_item.children if isinstance(el, Paragraph))
+                    raw_text = next(el for el in paragraph.children if isinstance(el, RawText))
+                    raw_text.children = str(node)
+                except StopIteration:
+                    # If no paragraph or raw text found, do nothing
+                    pass
 
     def to_markdown(self, indent: int | str = 4) -> str:
         """Convert the node and its children to a markdown string.
@@ -111,21 +267,20 @@ class Node(NodeMixin):
         else:
             indent_str = indent
 
-        # Start with an empty list to store markdown lines
+        # Start with an empty list to store markdown lines, joined once at the end
         result = []
-
-        # Use depth-first traversal to build the markdown representation
-        def _build_markdown(node, level=0):
-            # Add the current node
-            current_indent = indent_str * level
-            result.append(f"{current_indent}- {str(node)}")
-
-            # Add all children recursively
-            for child in node.children:
-                _build_markdown(child, level + 1)
-
-        # Start the recursive generation from this node
-        _build_markdown(self)
+        # indentation strings by level, extended as deeper levels are reached
+        indents = [""]
+
+        # Depth-first traversal with an explicit stack, children are pushed in reverse to pop them in order
+        stack = [(self, 0)]
+        while stack:
+            node, level = stack.pop()
+            if level == len(indents):
+                indents.append(indents[-1] + indent_str)
+            result.append(f"{indents[level]}- {str(node)}")
+            if node._children:
+                stack.extend((child, level + 1) for child in reversed(node._children))
 
         # Join all lines into a single string
         return "\n".join(result)
@@ -137,22 +292,7 @@ class Node(NodeMixin):
         parser = Markdown()
         ast = parser.parse(dedent(content.strip("\n")))
 
-        item_to_node = {}
-
-        for li, parent_li, _ in walk_list_items(ast):
-            if li in item_to_node:
-                node = item_to_node[li]
-            else:
-                node = cls.from_list_item(li, **kwargs)
-                item_to_node[li] = node
-
-            # this must already exist since we're parsing a tree
-            parent = item_to_node[parent_li] if parent_li else None
-
-            if parent:
-                node.parent = parent
-
-        roots = [node for node in item_to_node.values() if node.is_root]
+        roots = cls._from_ast(ast, **kwargs)
 
         # return None if no roots found, a single root node if only one root, or a list of roots
         if len(roots) == 0:
@@ -161,6 +301,43 @@ class Node(NodeMixin):
             return roots[0]
         return roots
 
+    @classmethod
+    def _from_ast(cls, element: Element, **kwargs) -> list["Node"]:
+        """Create node trees from all list items in a markdown AST element.
+
+        Args:
+            element: The AST element to walk, e.g. a parsed Document or a List.
+            **kwargs: Passed on to the constructors of the nodes.
+
+        Returns:
+            list[Node]: The root nodes, one for each list item that isn't nested in another list item.
+        """
+        roots = []
+
+        # walk the AST in pre-order with an explicit stack, carrying the node of the closest enclosing list item
+        stack = [(element, None)]
+        while stack:
+            el, parent = stack.pop()
+            if isinstance(el, ListItem):
+                node = cls.from_list_item(el, **kwargs)
+                if parent is None:
+                    roots.append(node)
+                else:
+                    # build the tree without recomputing states on every attach
+                    node._attach_silent(parent)
+                parent = node
+
+            # inline elements like RawText hold a string instead of a list of children
+            children = getattr(el, "children", None)
+            if isinstance(children, list):
+                stack.extend((child, parent) for child in reversed(children))
+
+        # derive all inner node states once, bottom-up, and drop the name indices once per tree
+        for root in roots:
+            root._recompute_subtree()
+            root._invalidate_name_indices()
+        return roots
+
     @classmethod
     def from_list_item(cls, list_item: ListItem, **kwargs) -> "Node":
         """Create a node from a ListItem."""
@@ -168,14 +345,9 @@ class Node(NodeMixin):
             return None
 
         text = get_raw_text_from_listtem(list_item)
-        marker, ref, ref_links = extract_node_marker_and_refs(text)
-        content = extract_str_content(text)
-        node_id = str(uuid.uuid4())[:8]
-
-        # Get class and state from registry with fallback to Node
-        node_class, completed, blocked = cls._node_registry.get(marker, (Node, False, False))
-        node = node_class(content, node_id, completed=completed, blocked=blocked, list_item=list_item, **kwargs)
-        return node
+        marker, content = extract_marker_and_content(text)
+        node_id = f"{next(_node_ids):08x}"
+        return cls.from_contents(node_id, content, marker, list_item, **kwargs)
 
     @classmethod
     def from_contents(
@@ -184,18 +356,63 @@ class Node(NodeMixin):
         """Create a node from contents."""
 
         # Get class and state from registry with fallback to Node
-        node_class, completed, blocked = cls._node_registry.get(marker, (Node, False, False))
+        node_class, completed, blocked = cls._node_registry.get(marker, _UNKNOWN_MARKER_ENTRY)
         node = node_class(content, node_id, completed=completed, blocked=blocked, list_item=list_item, **kwargs)
         return node
 
     def find_by_name(self, prefix: str) -> Optional["Node"]:
-        """Find a child node by its name or prefix of a name."""
-        return find(self, lambda node: node.name.startswith(prefix))
+        """Find a child node by its name or prefix of a name.
+
+        The first matching node in pre-order is returned. Lookups use an index of the names in this subtree, which
+        is built on the first lookup and rebuilt after a node in the subtree was renamed, attached or detached.
+        """
+        index = self._name_index
+        if index is None:
+            index = self._build_name_index()
+        names, entries = index
+
+        # matching names are adjacent in the sorted index, pick the one that comes first in pre-order
+        best = None
+        for i in range(bisect_left(names, prefix), len(names)):
+            if not names[i].startswith(prefix):
+                break
+            if best is None or entries[i][0] < best[0]:
+                best = entries[i]
+        return best[1]() if best else None
+
+    def _build_name_index(self) -> tuple[list[str], list[tuple[int, weakref.ref]]]:
+        """Index the names of this subtree, sorted by name, with the pre-order position of each node.
+
+        Nodes are referenced weakly, so that the index doesn't keep nodes alive or create reference cycles.
+        """
+        indexed = sorted((node._name, position, node) for position, node in enumerate(self.iter_preorder()))
+        names = [name for name, _, _ in indexed]
+        entries = [(position, weakref.ref(node)) for _, position, node in indexed]
+        self._name_index = index = (names, entries)
+        return index
+
+    def _invalidate_name_indices(self):
+        """Drop the name indices of this node and its ancestors, whose subtrees contain this node."""
+        node = self
+        while node is not None:
+            node._name_index = None
+            node = node._parent
 
     def _notify_parent(self):
-        """Notify parent of state change to trigger state recomputation."""
-        if self.parent:
-            self.parent._recompute_state()
+        """Notify ancestors of a state change by marking them dirty.
+
+        They recompute their state when it is read, except for node types with `_eager_state`, which recompute
+        right away.
+        """
+        parent = self._parent
+        # stop at the first dirty ancestor, all nodes above it are dirty already
+        while parent is not None and not parent._dirty:
+            parent._dirty = True
+            if parent._eager_state:
+                # recompute right away, this notifies the ancestors if the state changed
+                parent._refresh_state()
+                return
+            parent = parent._parent
 
     def _leaf_state(self) -> Tuple[bool, bool]:
         """The default state of a leaf node. Subclasses can override this behavior."""
@@ -207,27 +424,37 @@ class Node(NodeMixin):
         Args:
             notify: Whether to notify parent after recomputation
         """
-        # current state is the default
-        is_blocked = self._blocked
-        is_completed = self._completed
-
         # Collect states of child tasks
-        children = self.children
+        children = self._children
 
         if not children:
             # Stateful Nodes by default just maintain their current state when they are leaves.
             # Subclasses can override this bevavior.
             is_completed, is_blocked = self._leaf_state()
         else:
-            # by default, a node is blocked if any of its children are blocked
-            is_blocked = any(isinstance(child, Node) and child.is_blocked for child in children)
+            # by default, a node is blocked if any of its children are blocked, and completed if it is not blocked
+            # and all its children are completed. Both are derived in a single pass over the children.
+            is_blocked = False
+            is_completed = True
+            for child in children:
+                if child.is_blocked:
+                    # a blocked child blocks this node, no need to look further
+                    is_blocked = True
+                    is_completed = False
+                    break
+                if is_completed and not child.is_completed:
+                    is_completed = False
+
+        self._update_state(is_completed, is_blocked, notify)
+
+    def _update_state(self, is_completed: bool, is_blocked: bool, notify: bool = True):
+        """Store a newly derived state, notifying the parent only if the state changed.
 
-            # a node is completed if it is not blocked and all its children are completed
-            is_completed = (
-                False if is_blocked else all(isinstance(child, Node) and child.is_completed for child in children)
-            )
-
-        # if any state changed, update the state and optionally notify the parent
+        Args:
+            is_completed: The derived completed state
+            is_blocked: The derived blocked state
+            notify: Whether to notify parent if the state changed
+        """
         if self._completed != is_completed or self._blocked != is_blocked:
             self._completed = is_completed
             self._blocked = is_blocked
@@ -236,18 +463,49 @@ class Node(NodeMixin):
             if notify:
                 self._notify_parent()
 
-    def _post_detach(self, parent: "Node"):
-        """Notify parent of detachment"""
-        parent._recompute_state()
+    def _recompute_subtree(self):
+        """Recompute the state of all inner nodes of this subtree bottom-up, without notifying the parent.
+
+        Leaf nodes keep their current state.
+        """
+        for node in self.iter_postorder():
+            if node._children:
+                node._recompute_state(notify=False)
+
+    def _ensure_clean(self):
+        """Recompute the state of this node if it is dirty."""
+        if self._dirty:
+            self._refresh_state()
+
+    def _refresh_state(self):
+        """Recompute a dirty node's state and clear the dirty flag.
+
+        Dirty descendants are refreshed first, even those whose state isn't read by `_recompute_state()`. Otherwise
+        they would remain dirty below a clean node, and their next change would not reach this node.
+        """
+        # post-order over the dirty part of the subtree, with an explicit stack instead of one call per level
+        stack = [(self, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if children_done:
+                node._dirty = False
+                node._recompute_state()
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node._children) if child._dirty)
+
+    def _children_changed(self):
+        """Mark this node and its ancestors dirty after a child was attached or detached."""
+        if not self._dirty:
+            self._dirty = True
+            if self._eager_state:
+                self._refresh_state()
+            else:
+                self._notify_parent()
 
-    def _post_attach(self, parent: "Node"):
-        """Recompute state after attaching to parent."""
-        parent._recompute_state()
 
-    def _post_attach_children(self, children: list["Node"]):
-        """Recompute state after attaching children."""
-        self._recompute_state()
+# Source of ids for nodes created from markdown, unique within the process
+_node_ids = itertools.count()
 
-    def _post_detach_children(self, children: list["Node"]):
-        """Recompute state after detaching children."""
-        self._recompute_state()
+# Registry entry for markers that aren't registered: a plain Node with default state
+_UNKNOWN_MARKER_ENTRY = (Node, False, False)
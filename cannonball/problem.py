@@ -2,4 +2,6 @@ from .node import Node
 
 
 class Problem(Node):
+    __slots__ = ()
+
     marker = "P"
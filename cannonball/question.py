@@ -3,14 +3,10 @@ from .node import Node
 
 # TODO stubs so that the tests pass
 class Question(Node):
-    @property
-    def marker(self) -> str:
-        """Get the marker for the node."""
-        if self._blocked:
-            return "?"
-        if self._completed:
-            return "Q"
-        return "q"
+    __slots__ = ()
+
+    # open, completed, blocked (and the invalid blocked + completed state)
+    _markers = ("q", "Q", "?", "?")
 
 
 # class Question(Task):
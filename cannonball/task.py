@@ -1,8 +1,13 @@
-from typing import Optional
+from typing import Optional, Tuple
 from .node import Node
 
 
 class Task(Node):
+    __slots__ = ("_auto_resolve",)
+
+    # open, completed, blocked (and the invalid blocked + completed state)
+    _markers = (" ", "x", "!", "!")
+
     def __init__(
         self,
         name: str,
@@ -14,33 +19,26 @@ class Task(Node):
         auto_resolve: bool = True,
         **kwargs,
     ):
-        super().__init__(name, id, parent, children, completed=completed, blocked=blocked, **kwargs)
+        # set before the children are attached, deriving the state from them reads it
         self._auto_resolve: bool = auto_resolve
+        super().__init__(name, id, parent, children, completed=completed, blocked=blocked, **kwargs)
 
     @property
     def auto_resolve(self) -> bool:
         return self._auto_resolve
 
-    @property
-    def marker(self) -> str:
-        """Get the marker for the node."""
-        if self._blocked:
-            return "!"
-        if self._completed:
-            return "x"
-        return " "
-
     @auto_resolve.setter
     def auto_resolve(self, value: bool):
         """Set auto_resolve property and recompute state."""
         if self._auto_resolve != value:
+            # without auto_resolve the task keeps its current state, derive it from the children first
+            self._ensure_clean()
             self._auto_resolve = value
             if self._auto_resolve:
-                self._blocked = False
-                self._completed = False
+                # don't reset the state here, otherwise _recompute_state can't detect the change to notify the parent
                 self._recompute_state()
 
-    def _leaf_state(self):
+    def _leaf_state(self) -> Tuple[bool, bool]:
         if self._auto_resolve:
             return (False, False)
         return self._completed, self._blocked
@@ -54,6 +52,7 @@ class Task(Node):
         if not self.is_leaf:
             return False
 
+        self._ensure_clean()
         self._auto_resolve = False
         if self._blocked:
             return False
@@ -75,6 +74,7 @@ class Task(Node):
         if not self.is_leaf:
             return False
 
+        self._ensure_clean()
         self._auto_resolve = False
         if not self._blocked:
             return False
@@ -96,6 +96,7 @@ class Task(Node):
         if not self.is_leaf:
             return False
 
+        self._ensure_clean()
         self._auto_resolve = False
         if self._completed or self._blocked:
             return False
@@ -117,6 +118,7 @@ class Task(Node):
         if not self.is_leaf:
             return False
 
+        self._ensure_clean()
         self._auto_resolve = False
         if not self._completed:
             return False
@@ -6,6 +6,16 @@ import re
 
 renderer = MarkdownRenderer()
 
+# Node marker at the start of a list item's text, e.g. "[x] " in "[x] Task". Uses a non-greedy quantifier (.+?) to
+# support multi-character markers but stop at the first closing bracket.
+_MARKER_RE = re.compile(r"^\s*\[(.+?)]\s*")
+# Reference links, e.g. "[[#^ref_id]]"
+_REF_LINK_RE = re.compile(r"\[\[#\^(\w+)]]")
+# Reference IDs, e.g. " ^ref_id"
+_REF_RE = re.compile(r"(?:^|\s+)\^(\w+)")
+# Leading whitespace, bullet point and marker, each optional, e.g. "  - [x] "
+_BULLET_MARKER_RE = re.compile(r"^(?:\s*-\s*)?(?:\s*\[.+?]\s*)?")
+
 
 def get_raw_text_from_listtem(li: ListItem) -> Optional[str]:
     """Get the raw text from a ListItem.
@@ -17,15 +27,20 @@ def get_raw_text_from_listtem(li: ListItem) -> Optional[str]:
     """
 
     assert isinstance(li, ListItem), "Expected a ListItem"
-    text = renderer.render_children(li).split("\n", 1)
-    if len(text) > 0:
-        return text[0]
-    else:
-        return ""
+
+    # Only the first line is needed. Render the children one at a time and stop at the first line break, instead
+    # of rendering the item's whole subtree including all nested lists.
+    parts = []
+    for child in li.children:
+        head, line_break, _ = renderer.render(child).partition("\n")
+        parts.append(head)
+        if line_break:
+            break
+    return "".join(parts)
 
 
 def walk_list_items(node: Element, parent=None, level=0, apply_fn: Optional[Callable] = None):
-    """Recursively walk the AST and yield all list items with parent and nesting level.
+    """Walk the AST in pre-order and yield all list items with parent and nesting level.
 
     Args:
         node: The current node in the abstract syntax tree (AST).
@@ -37,17 +52,22 @@ def walk_list_items(node: Element, parent=None, level=0, apply_fn: Optional[Call
         tuple: A tuple containing the current node, its parent, and its nesting level.
             If apply_fn is provided, yields (apply_fn(node), apply_fn(parent), level).
     """
-    if isinstance(node, ListItem):
-        if apply_fn is not None:
-            yield (apply_fn(node), apply_fn(parent), level)
-        else:
-            yield node, parent, level
-        parent = node
-        level += 1
-
-    if hasattr(node, "children"):
-        for child in node.children:
-            yield from walk_list_items(child, parent, level, apply_fn=apply_fn)
+    # explicit stack instead of recursion, so that each yield doesn't pass through one generator per level
+    stack = [(node, parent, level)]
+    while stack:
+        node, parent, level = stack.pop()
+        if isinstance(node, ListItem):
+            if apply_fn is not None:
+                yield (apply_fn(node), apply_fn(parent), level)
+            else:
+                yield node, parent, level
+            parent = node
+            level += 1
+
+        # inline elements like RawText hold a string instead of a list of children, leaves have an empty list
+        children = getattr(node, "children", None)
+        if children and isinstance(children, list):
+            stack.extend((child, parent, level) for child in reversed(children))
 
 
 def extract_node_marker_and_refs(text: str) -> Tuple[Optional[str], str, list]:
@@ -66,18 +86,19 @@ def extract_node_marker_and_refs(text: str) -> Tuple[Optional[str], str, list]:
     ref = None
     ref_links = []
 
-    # Extract node marker with a regex that supports multi-character markers
-    # Use a non-greedy quantifier (.+?) to match multiple characters but stop at the first closing bracket
-    node_marker_match = re.match(r"^\s*\[(.+?)]\s*", text)
+    # Extract node marker, which can be multiple characters long
+    node_marker_match = _MARKER_RE.match(text)
     if node_marker_match:
         node_marker = node_marker_match.group(1)
 
-    ref_links = re.findall(r"\[\[#\^(\w+)]]", text)
+    # References and reference links both contain a caret, most texts have neither
+    if "^" in text:
+        ref_links = _REF_LINK_RE.findall(text)
 
-    # Extract first reference ID (^ref)
-    ref_match = re.search(r"(?:^|\s+)\^(\w+)", text)
-    if ref_match:
-        ref = ref_match.group(1)
+        # Extract first reference ID (^ref)
+        ref_match = _REF_RE.search(text)
+        if ref_match:
+            ref = ref_match.group(1)
 
     return node_marker, ref, ref_links
 
@@ -98,15 +119,8 @@ def extract_str_content(text: str) -> str:
         get_content("- [D] Task 4 [[#^ref]]") returns "Task 4"
         get_content("- [a] Task 5 ^ref") returns "Task 5"
     """
-    # Remove leading whitespace and bullet points
-    text = re.sub(r"^\s*-\s*", "", text)
-
-    # Extract marker and references
-    marker, ref, ref_links = extract_node_marker_and_refs(text)
-
-    # Remove marker if present
-    if marker is not None:
-        text = re.sub(r"^\s*\[" + re.escape(marker) + r"\]\s*", "", text)
+    # Remove leading whitespace, bullet point and marker in a single match, which always succeeds
+    text = text[_BULLET_MARKER_RE.match(text).end() :]
 
     # Remove references (^ref)
     # if ref is not None:
@@ -119,3 +133,28 @@ def extract_str_content(text: str) -> str:
     text = text.strip()
 
     return text
+
+
+def extract_marker_and_content(text: str) -> Tuple[Optional[str], str]:
+    """Extract the node marker and the content from text in a single scan.
+
+    Equivalent to calling `extract_node_marker_and_refs` and `extract_str_content`, but only scans the
+    text once in the common case of a list item text that starts with a marker.
+
+    Args:
+        text (str): The text to extract from, e.g. "[?] Content ^ref_id".
+
+    Returns:
+        tuple: A tuple containing the node marker (None for regular Bullets) and the content.
+    """
+    # fast path for the common single character markers, e.g. "[x] Task"
+    stripped = text.lstrip()
+    if len(stripped) >= 3 and stripped[0] == "[" and stripped[2] == "]" and stripped[1] != "\n":
+        return stripped[1], stripped[3:].strip()
+
+    marker_match = _MARKER_RE.match(text)
+    if marker_match:
+        return marker_match.group(1), text[marker_match.end() :].strip()
+
+    # no marker at the start of the text, fall back to the general content extraction
+    return None, extract_str_content(text)
@@ -1,24 +1,77 @@
+import itertools
 import time
 import threading
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from pathlib import Path
-from typing import Callable, List, Set
+from typing import Callable, Dict, List, Set
 
 from cannonball.document import Document
 
 
 class MarkdownWatcher(FileSystemEventHandler):
-    def __init__(self, file_paths: List[Path], callback: Callable[["MarkdownWatcher", Path], None]):
+    def __init__(
+        self,
+        file_paths: List[Path],
+        callback: Callable[["MarkdownWatcher", Path], None],
+        debounce: float = 0,
+    ):
+        """Watch markdown files for modifications.
+
+        Args:
+            file_paths: The files to watch.
+            callback: Called with the watcher and the resolved path of a modified file.
+            debounce: Seconds to wait for further modifications of a file before the callback is called once for
+                all of them. Editors often write a file several times per save. By default, the callback is called
+                for every modification.
+        """
         self.callback = callback
-        self.watched_files = set(map(lambda p: p.resolve(), file_paths))
+        self.debounce = debounce
+        self._pending: Dict[Path, threading.Timer] = {}
+        self._resume_timers: Set[threading.Timer] = set()
+        self._pending_lock = threading.Lock()
+        # debounced callbacks run on timer threads, don't let them overlap each other or the observer thread
+        self._callback_lock = threading.Lock()
+        # resolve each watched path once, and map resolved paths (as passed to the callback) to themselves
+        self._resolved: Dict[Path, Path] = {p: p.resolve() for p in file_paths}
+        self._resolved.update({p: p for p in self._resolved.values()})
+        self.watched_files = set(self._resolved.values())
         self.paused_files: Set[Path] = set()
-        self.directories = {p.resolve().parent for p in file_paths}
+        self.directories = {p.parent for p in self.watched_files}
         self.observer = Observer()
 
     def on_modified(self, event):
-        path = Path(event.src_path).resolve()
+        # look up watched paths in the cache, other paths may point to a watched file through a symlink
+        path = self._resolve(Path(event.src_path))
         if path in self.watched_files and path not in self.paused_files:
+            if self.debounce > 0:
+                self._schedule(path)
+            else:
+                self._call(path)
+
+    def _schedule(self, path: Path):
+        """(Re)start the debounce timer of a path, replacing a pending one."""
+        timer = threading.Timer(self.debounce, self._fire, args=(path,))
+        timer.daemon = True
+        with self._pending_lock:
+            pending = self._pending.get(path)
+            if pending is not None:
+                pending.cancel()
+            self._pending[path] = timer
+        timer.start()
+
+    def _fire(self, path: Path):
+        """Call the callback once the debounce timer of a path expired without further modifications."""
+        with self._pending_lock:
+            # a later modification may have replaced this timer just as it expired
+            if self._pending.get(path) is not threading.current_thread():
+                return
+            del self._pending[path]
+        if path not in self.paused_files:
+            self._call(path)
+
+    def _call(self, path: Path):
+        with self._callback_lock:
             self.callback(self, path)
 
     def start(self):
@@ -29,19 +82,36 @@ class MarkdownWatcher(FileSystemEventHandler):
     def stop(self):
         self.observer.stop()
         self.observer.join()
+        with self._pending_lock:
+            for timer in itertools.chain(self._pending.values(), self._resume_timers):
+                timer.cancel()
+            self._pending.clear()
+            self._resume_timers.clear()
+
+    def _resolve(self, path: Path) -> Path:
+        """Resolve a path, using the cached result for watched files."""
+        return self._resolved.get(path) or path.resolve()
 
     def pause(self, path: Path):
-        self.paused_files.add(path.resolve())
+        self.paused_files.add(self._resolve(path))
 
     def resume(self, path: Path):
-        self.paused_files.discard(path.resolve())
+        self.paused_files.discard(self._resolve(path))
 
     def resume_later(self, path: Path, delay: float = 0.1):
-        def _resume():
-            time.sleep(delay)
-            self.resume(path)
+        """Resume a path after `delay` seconds, unless the watcher is stopped before."""
+        timer = threading.Timer(delay, self._resume_timer_expired, args=(path,))
+        with self._pending_lock:
+            self._resume_timers.add(timer)
+        timer.start()
 
-        threading.Thread(target=_resume).start()
+    def _resume_timer_expired(self, path: Path):
+        with self._pending_lock:
+            # stop() may have cancelled this timer just as it expired
+            if threading.current_thread() not in self._resume_timers:
+                return
+            self._resume_timers.discard(threading.current_thread())
+        self.resume(path)
 
 
 if __name__ == "__main__":
@@ -65,7 +135,7 @@ if __name__ == "__main__":
     for pattern in args.paths:
         files.extend(map(Path, glob.glob(pattern)))
 
-    watcher = MarkdownWatcher(files, on_change)
+    watcher = MarkdownWatcher(files, on_change, debounce=0.05)
     try:
         watcher.start()
         print("Watching for file changes... Press Ctrl+C to stop.")
@@ -5,9 +5,9 @@ setup(
     version="0.1.0",
     packages=find_packages(),
     install_requires=[
-        "anytree>=2.12.1",
         "pymongo>=4.5.0",
         "marko>=2.1.2",
+        "watchdog>=6.0.0",
         "pytest>=7.3.1",
         "pytest-mock>=3.14.0",
         "ruff==0.11.0",
@@ -67,6 +67,21 @@ class TestDecision:
         assert decision.decision == option1
         assert decision.is_decided is True
 
+    def test_decision_init_with_children(self, mocker):
+        """Test that a decision constructed with children derives its state once, when the children are attached."""
+        spy = mocker.spy(Decision, "_recompute_state")
+        option = Bullet("Option")
+        decision = Decision("Decision", children=[option], auto_decide=True)
+        assert spy.call_count == 1
+
+        assert decision.is_completed is True
+        assert decision.decision == option
+        assert spy.call_count == 1
+
+        decision.children = []
+        assert decision.is_blocked is True
+        assert decision.decision is None
+
     def test_decision_init_with_blocked_options(self):
         decision = Decision("Decision", auto_decide=True)
         option1 = Task("Option 1", blocked=True, parent=decision)
@@ -426,6 +441,54 @@ class TestDecisionWithOtherOptions:
         assert decision.decision is None
         assert decision.get_options() == list(bullet_with_options.children)
 
+    def test_decide_notifies_parent(self):
+        """Test that manually deciding propagates the completed state to the parent."""
+        parent = Node("Parent")
+        decision = Decision("Decision", parent=parent)
+        option1 = Bullet("Option 1", parent=decision)
+        Bullet("Option 2", parent=decision)
+        assert parent.is_completed is False
+
+        assert decision.decide(option1) is True
+        assert decision.is_completed is True
+        assert parent.is_completed is True
+
+        decision.decide(None)
+        assert decision.is_completed is False
+        assert parent.is_completed is False
+
+    def test_decide_rejects_invalid_options(self):
+        """Test that only non-blocked options of the decision can be decided."""
+        decision = Decision("Decision")
+        option = Task("Option", parent=decision)
+        blocked = Task("Blocked", parent=decision, blocked=True)
+        other = Task("Other")
+
+        assert decision.decide(blocked) is False
+        assert decision.decide(other) is False
+        assert decision.decision is None
+
+        decision.set_options([other])
+        assert decision.decide(option) is False
+        assert decision.decide(other) is True
+        assert decision.decision is other
+
+    def test_decide_checks_options_set_later(self):
+        """Test that decide() checks against the options of the latest set_options() call."""
+        decision = Decision("Decision", options=[Task("First")])
+        second = Task("Second")
+        third = Task("Third", blocked=True)
+        assert decision.decide(second) is False
+
+        decision.set_options([second, third])
+        assert decision._option_ids == {id(second), id(third)}
+        assert decision.decide(third) is False
+        assert decision.decide(second) is True
+
+        decision.set_options([])
+        decision.decide(None)
+        assert decision.decide(second) is False
+
     def test_get_options_with_include_blocked(self):
         """Test getting options including blocked ones."""
         decision = Decision("Decision")
@@ -444,6 +507,37 @@ class TestDecisionWithOtherOptions:
         assert option1 in all_options
         assert option2 in all_options
 
+    def test_get_options_follows_child_state(self):
+        """Test that the options reflect state changes of the children."""
+        decision = Decision("Decision")
+        option1 = Task("Option 1", parent=decision)
+        option2 = Task("Option 2", parent=decision)
+        assert decision.get_options() == [option1, option2]
+
+        option1.block()
+        assert decision.get_options() == [option2]
+
+        option1.unblock()
+        assert decision.get_options() == [option1, option2]
+
+        option2.parent = None
+        assert decision.get_options() == [option1]
+
+        # modifying the returned list doesn't affect the decision
+        decision.get_options().clear()
+        assert decision.get_options() == [option1]
+
+    def test_get_options_follows_external_option_state(self):
+        """Test that options set with set_options reflect state changes, even though they don't notify."""
+        decision = Decision("Decision")
+        option1 = Task("Option 1")
+        option2 = Task("Option 2")
+        decision.set_options([option1, option2])
+        assert decision.get_options() == [option1, option2]
+
+        option1.block()
+        assert decision.get_options() == [option2]
+
     def test_task_decision_tree(self, task_decision_tree):
         task = task_decision_tree
         decision = task.find_by_name("Decision")
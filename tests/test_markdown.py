@@ -106,6 +106,61 @@ class TestParseMarkdown:
         assert isinstance(artefact, Artefact)
         assert artefact.name == "Artefact"
 
+    def test_from_markdown_recomputes_each_inner_node_once(self, mocker):
+        """Test that parsing recomputes the state of each inner node once, after the tree is built."""
+        spy = mocker.spy(Task, "_recompute_state")
+        root = Node.from_markdown("""
+        - [ ] Task 1
+            - [ ] Task 2
+                - [x] Task 3
+                - [x] Task 4
+            - [ ] Task 5
+                - [x] Task 6
+                - [x] Task 7
+        """)
+        # only the three tasks with children are recomputed
+        assert spy.call_count == 3
+        assert root.is_completed is True
+        assert root.find_by_name("Task 2").is_completed is True
+        assert root.find_by_name("Task 3").is_completed is True
+
+    def test_from_markdown_invalidates_name_indices_once_per_tree(self, mocker):
+        """Test that parsing doesn't walk the ancestors on every attach to drop their name indices."""
+        spy = mocker.spy(Node, "_invalidate_name_indices")
+        root = Node.from_markdown("""
+        - [ ] Task 1
+            - [ ] Task 2
+                - [x] Task 3
+            - [ ] Task 4
+        """)
+        # once for the name of each new node, and once for the tree after it is built
+        assert spy.call_count == 4 + 1
+        assert root.find_by_name("Task 3").is_completed is True
+        assert root.find_by_name("Task 4").parent is root
+
+    def test_from_markdown_keeps_leaf_states(self):
+        """Test that leaf nodes keep the state of their marker after parsing."""
+        root = Node.from_markdown("""
+        - [ ] Task 1
+            - [x] Task 2
+            - [!] Task 3
+        """)
+        assert root.find_by_name("Task 2").is_completed is True
+        assert root.find_by_name("Task 3").is_blocked is True
+        assert root.is_blocked is True
+
+    def test_from_markdown_assigns_unique_ids(self):
+        """Test that every parsed node gets its own 8 character id."""
+        root = Node.from_markdown("""
+        - [ ] Task 1
+            - [ ] Task 2
+            - Bullet
+        """)
+        other = Node.from_markdown("- [ ] Task 1")
+        ids = [node.id for node in root.iter_preorder()] + [other.id]
+        assert len(set(ids)) == len(ids)
+        assert all(len(node_id) == 8 for node_id in ids)
+
 
 class TestMarkdown:
     def test_basic_markdown_parsing(self, task_with_2_subtasks):
@@ -1,4 +1,6 @@
-from cannonball import Node, Bullet, Artefact, Question, Decision, Task
+import weakref
+
+from cannonball import Node, Bullet, Artefact, Question, Decision, Task, Goal, Problem, Experiment
 
 
 class TestNode:
@@ -89,6 +91,67 @@ class TestNode:
         found = parent.find_by_name("Nonexistent")
         assert found is None
 
+    def test_find_by_name_ambiguous_prefix(self):
+        """Test that a prefix matching several nodes returns the first match in pre-order instead of raising."""
+        task1 = Node("Task 1")
+        task2 = Node("Task 2", children=[Node("Task 2.1")])
+        parent = Node("Parent", children=[task1, task2])
+
+        assert parent.find_by_name("Task") == task1
+        assert parent.find_by_name("Task 2") == task2
+
+    def test_node_types_are_slotted(self):
+        """Test that none of the node types carry a per-instance attribute dict."""
+        for node_class in (Node, Bullet, Task, Decision, Question, Artefact, Problem, Goal, Experiment):
+            assert not hasattr(node_class("Node"), "__dict__"), node_class.__name__
+
+    def test_find_by_name_returns_first_in_preorder(self):
+        """Test that the first matching node in pre-order is found, not the smallest name."""
+        parent = Node("Parent")
+        child = Node("Child B", parent=parent)
+        grandchild = Node("Child A", parent=child)
+
+        assert parent.find_by_name("Child") == child
+        assert child.find_by_name("Child A") == grandchild
+        assert parent.find_by_name("") == parent
+
+    def test_find_by_name_after_changes(self):
+        """Test that renaming, attaching and detaching nodes is reflected in later lookups."""
+        parent = Node("Parent")
+        child = Node("Child", parent=parent)
+        assert parent.find_by_name("Child") == child
+
+        child.name = "Renamed"
+        assert parent.find_by_name("Child") is None
+        assert parent.find_by_name("Ren") == child
+
+        other = Node("Other")
+        other.parent = parent
+        assert parent.find_by_name("Oth") == other
+
+        child.parent = None
+        assert parent.find_by_name("Ren") is None
+
+    def test_find_by_name_index_survives_unrelated_changes(self):
+        """Test that changes outside of a subtree don't invalidate its name index."""
+        parent = Node("Parent")
+        Node("Child", parent=parent)
+        parent.find_by_name("Child")
+        index = parent._name_index
+
+        other = Node("Other")
+        Node("Other Child", parent=other)
+        other.name = "Renamed"
+        assert parent._name_index is index
+
+    def test_find_by_name_index_does_not_keep_nodes_alive(self):
+        """Test that the name index doesn't create a reference cycle with the indexed nodes."""
+        node = Node("Node")
+        assert node.find_by_name("Node") is node
+        ref = weakref.ref(node)
+        del node
+        assert ref() is None
+
 
 class TestBullet:
     def test_bullet_init(self):
@@ -107,3 +170,50 @@ class TestBullet:
         """Test Bullet node string."""
         bullet = Bullet("Test Bullet")
         assert str(bullet) == "Test Bullet"
+
+
+class TestMarkers:
+    def test_goal_markers(self):
+        """Test the markers of a Goal in each state."""
+        assert Goal("Goal").marker == "g"
+        assert Goal("Goal", completed=True).marker == "G"
+        assert Goal("Goal", blocked=True).marker == "~"
+        assert str(Goal("Goal", blocked=True)) == "[~] Goal"
+
+    def test_task_markers(self):
+        """Test the markers of a Task in each state."""
+        assert Task("Task").marker == " "
+        assert Task("Task", completed=True).marker == "x"
+        assert Task("Task", blocked=True).marker == "!"
+        assert str(Task("Task", completed=True)) == "[x] Task"
+
+    def test_artefact_markers(self):
+        """Test the markers of an Artefact in each state."""
+        assert Artefact("Artefact").marker == "a"
+        assert Artefact("Artefact", completed=True).marker == "A"
+        assert Artefact("Artefact", blocked=True).marker == "a"
+
+    def test_derived_state_markers(self):
+        """Test the markers of node types whose state is derived from their children."""
+        assert Experiment("Experiment").marker == "e"
+        assert Experiment("Experiment", completed=True).marker == "E"
+        assert Experiment("Experiment", blocked=True).marker == "%"
+
+        decision = Decision("Decision")
+        assert decision.marker == "$"
+        option = Bullet("Option", parent=decision)
+        assert decision.marker == "d"
+        decision.decide(option)
+        assert decision.marker == "D"
+
+        question = Question("Question")
+        task = Task("Task", parent=question)
+        assert question.marker == "q"
+        task.block()
+        assert question.marker == "?"
+
+    def test_node_marker_from_constructor(self):
+        """Test that nodes without a marker table use the marker passed to the constructor."""
+        assert Node("Node", marker="F").marker == "F"
+        assert Node("Node", marker="F", completed=True).marker == "F"
+        assert Node("Node").marker is None
@@ -1,5 +1,58 @@
-from cannonball import Node
+from cannonball import Bullet, Decision, Node, Question, Task
 import pytest
+import random
+import sys
+
+
+def _run_random_ops(seed: int, read_after_each_op: bool) -> list[tuple]:
+    """Apply random tree and state changes to a set of nodes and return the final state of each node."""
+    rng = random.Random(seed)
+    nodes = []
+    for i in range(10):
+        kind = rng.randrange(5)
+        if kind == 0:
+            nodes.append(Node(f"Node {i}", completed=rng.random() < 0.5))
+        elif kind == 1:
+            state = rng.randrange(3)
+            nodes.append(Task(f"Task {i}", completed=state == 1, blocked=state == 2))
+        elif kind == 2:
+            nodes.append(Bullet(f"Bullet {i}"))
+        elif kind == 3:
+            nodes.append(Decision(f"Decision {i}"))
+        else:
+            nodes.append(Question(f"Question {i}"))
+
+    def is_ancestor(node, other):
+        while other is not None:
+            if other is node:
+                return True
+            other = other.parent
+        return False
+
+    for _ in range(40):
+        node = rng.choice(nodes)
+        op = rng.randrange(5)
+        if op == 0:
+            parent = rng.choice(nodes + [None])
+            if not is_ancestor(node, parent):
+                node.parent = parent
+        elif op == 1:
+            node.children = [child for child in rng.sample(nodes, rng.randrange(4)) if not is_ancestor(child, node)]
+        elif op == 2 and isinstance(node, Task):
+            getattr(node, rng.choice(["complete", "block", "unblock", "reopen"]))()
+        elif op == 3 and isinstance(node, Decision):
+            node.decide(rng.choice(node.children + (None,)))
+        elif op == 4 and isinstance(node, Task):
+            node.auto_resolve = rng.random() < 0.5
+
+        if read_after_each_op:
+            for other in nodes:
+                repr(other)
+
+    return [
+        (node.name, node.is_completed, node.is_blocked, node.decision.name if getattr(node, "decision", None) else None)
+        for node in nodes
+    ]
 
 
 class TestStatefulNode:
@@ -78,9 +131,12 @@ class TestStatefulNode:
         assert child_spy.call_count == 0
 
         parent_spy = mocker.spy(ParentNode, "_recompute_state")
-        ParentNode("Parent Node", children=[child])
-        # called twice, but hard to avoid
-        parent_spy.assert_called()
+        parent = ParentNode("Parent Node", children=[child])
+        # the state is recomputed lazily, once, when it is read
+        assert parent_spy.call_count == 0
+        assert not parent.is_completed
+        assert not parent.is_blocked
+        assert parent_spy.call_count == 1
 
     def test_recompute_state_called_with_parent(self, mocker):
         """Test that recompute_state is called on initialization if there are children."""
@@ -99,7 +155,11 @@ class TestStatefulNode:
         ChildNode("Child Node", parent=parent)
 
         assert child_spy.call_count == 0
-        parent_spy.assert_called()
+        assert parent._dirty
+        parent_spy.assert_not_called()
+
+        assert not parent.is_completed
+        parent_spy.assert_called_once()
 
     def test_parent_child_relationship(self):
         """Test parent-child relationship creation."""
@@ -109,6 +169,102 @@ class TestStatefulNode:
         assert child.parent == parent
         assert child in parent.children
 
+    def test_parent_loop_raises(self):
+        """Test that a node cannot become its own ancestor."""
+        root = Node("Root")
+        child = Node("Child", parent=root)
+
+        with pytest.raises(ValueError):
+            root.parent = child
+
+        with pytest.raises(ValueError):
+            root.parent = root
+
+        assert root.parent is None
+        assert child.parent == root
+
+    def test_duplicate_children_raise(self):
+        """Test that a node cannot be added multiple times as a child."""
+        parent = Node("Parent")
+        child = Node("Child")
+
+        with pytest.raises(ValueError):
+            parent.children = [child, child]
+
+        assert parent.children == ()
+
+    def test_children_keep_parent_alive(self):
+        """Test that a node keeps its parent alive when the caller only holds on to the subtree."""
+        child = Node.from_markdown("""
+        - Root
+            - Child
+        """).children[0]
+        assert child.parent is not None
+        assert child.parent.name == "Root"
+        assert not child.is_root
+
+        def make_task():
+            return Task("Task", parent=Node("Parent"))
+
+        task = make_task()
+        assert task.parent.name == "Parent"
+        assert task in task.parent.children
+
+    def test_tree_iteration_order(self):
+        """Test pre-order and post-order iteration over a tree."""
+        root = Node("Root")
+        a = Node("A", parent=root)
+        a1 = Node("A1", parent=a)
+        a2 = Node("A2", parent=a)
+        b = Node("B", parent=root)
+
+        assert list(root.iter_preorder()) == [root, a, a1, a2, b]
+        assert list(root.iter_postorder()) == [a1, a2, a, b, root]
+        assert list(a1.iter_postorder()) == [a1]
+
+    def test_to_markdown_order_and_depth(self):
+        """Test that to_markdown renders the tree depth-first with children in order."""
+        root = Node("Root")
+        a = Node("A", parent=root)
+        Node("A1", parent=a)
+        Node("B", parent=root)
+        assert root.to_markdown(indent=2) == "- Root\n  - A\n    - A1\n  - B"
+        assert a.to_markdown(indent="\t") == "- A\n\t- A1"
+
+    def test_base_node_is_slotted(self):
+        """Test that base nodes don't carry a per-instance attribute dict."""
+        node = Node("Node")
+        assert not hasattr(node, "__dict__")
+        assert node.list_item is None
+
+    def test_children_list_allocated_on_first_child(self):
+        """Test that leaves don't allocate a children list, and that it is created on the first attach."""
+        parent = Node("Parent")
+        assert parent._children == ()
+        assert parent.is_leaf
+
+        child = Node("Child", parent=parent)
+        assert parent._children == [child]
+        assert child._children == ()
+
+        child.parent = None
+        assert parent.children == ()
+        assert parent.is_leaf
+
+    def test_delete_children(self):
+        """Test that deleting the children detaches them and recomputes the state."""
+        parent = Node("Parent")
+        child = Node("Child", blocked=True, parent=parent)
+        assert parent.is_blocked
+
+        del parent.children
+        assert parent.children == ()
+        assert child.parent is None
+
+        parent.children = [Node("Other", completed=True)]
+        assert not parent.is_blocked
+        assert parent.is_completed
+
     def test_state_propagation_to_parent(self):
         """Test that state changes in children propagate to parents."""
         parent = Node("Parent")
@@ -145,6 +301,50 @@ class TestStatefulNode:
         child1._notify_parent()
         assert not parent.is_blocked
 
+    def test_blocked_child_after_open_child(self):
+        """Test that a blocked child blocks the parent regardless of its position among the children."""
+        parent = Node("Parent")
+        Node("Open", parent=parent)
+        Node("Completed", completed=True, parent=parent)
+        Node("Blocked", blocked=True, parent=parent)
+
+        assert parent.is_blocked
+        assert not parent.is_completed
+
+    def test_refresh_deep_tree(self):
+        """Test that refreshing a tree deeper than the recursion limit doesn't recurse per level."""
+        root = Node("Root")
+        node = root
+        for i in range(sys.getrecursionlimit() + 10):
+            node = Node(f"Level {i}", parent=node)
+        node._completed = True
+        node._notify_parent()
+
+        assert root.is_completed
+        assert root.to_markdown(indent="").count("\n") == sys.getrecursionlimit() + 10
+
+    def test_state_does_not_depend_on_reads(self):
+        """Test that the state after random changes is the same whether or not it was read in between."""
+        for seed in range(200):
+            assert _run_random_ops(seed, False) == _run_random_ops(seed, True), f"seed {seed}"
+
+    def test_leaf_keeps_state_of_last_children(self):
+        """Test that a node losing its last child keeps the state derived from it, even if it wasn't read."""
+        parent = Node("Parent", completed=True)
+        blocked = Task("Blocked", blocked=True)
+        bullet = Bullet("Bullet")
+        parent.children = [blocked, bullet]
+        blocked.parent = None
+        bullet.parent = None
+        assert parent.is_completed is True
+        assert parent.is_blocked is False
+
+        parent.children = [blocked, bullet]
+        bullet.parent = None
+        blocked.parent = None
+        assert parent.is_completed is False
+        assert parent.is_blocked is True
+
     def test_post_attach_recomputation_completed(self):
         """Test state recomputation after attaching/detaching children."""
         parent = Node("Parent")
@@ -157,6 +357,58 @@ class TestStatefulNode:
         parent.children = [child1, child2]
         assert parent.is_completed
 
+    def test_bulk_children_assignment_recomputes_once(self, mocker):
+        """Test that assigning several children only recomputes the parent and its ancestors once."""
+
+        class ParentNode(Node):
+            pass
+
+        class RootNode(Node):
+            pass
+
+        root = RootNode("Root")
+        parent = ParentNode("Parent", parent=root)
+        children = [Node(f"Child {i}", completed=True) for i in range(5)]
+
+        parent_spy = mocker.spy(ParentNode, "_recompute_state")
+        root_spy = mocker.spy(RootNode, "_recompute_state")
+
+        parent.children = children
+        assert parent_spy.call_count == 0
+        assert root_spy.call_count == 0
+        assert root.is_completed
+        assert parent.is_completed
+        assert parent_spy.call_count == 1
+        assert root_spy.call_count == 1
+
+        # detaching all children in bulk derives the state the leaf keeps before the last child is detached,
+        # and once more as a leaf
+        parent.children = []
+        assert parent.is_completed
+        assert parent_spy.call_count == 3
+
+    def test_state_change_marks_ancestors_dirty(self):
+        """Test that a state change only marks ancestors dirty, and reading the state cleans the subtree."""
+        root = Node("Root")
+        blocked = Node("Blocked", blocked=True, parent=root)
+        branch = Node("Branch", parent=root)
+        leaf = Node("Leaf", parent=branch)
+        assert root.is_blocked
+
+        leaf._completed = True
+        leaf._notify_parent()
+        assert branch._dirty
+        assert root._dirty
+
+        # root is blocked by its first child, but the dirty branch is refreshed nonetheless
+        assert root.is_blocked
+        assert not any(node._dirty for node in root.iter_preorder())
+
+        blocked._blocked = False
+        blocked._completed = True
+        blocked._notify_parent()
+        assert root.is_completed
+
     def test_post_detach_recomputation_blocked(self, mocker):
         """Test state recomputation after attaching/detaching children."""
 
@@ -171,14 +423,14 @@ class TestStatefulNode:
         assert not parent.is_blocked
 
         child = Node("Child 1", parent=parent, blocked=True)
-        assert spy.call_count == 1
         assert not parent.is_completed
         assert parent.is_blocked
+        assert spy.call_count == 1
 
         # Detach child
         child.parent = None
-        assert spy.call_count > 1
         assert not parent.is_completed
+        assert spy.call_count > 1
 
         # parent is a leaf, but StatefulNode does not change its state, it remains blocked
         assert parent.is_blocked
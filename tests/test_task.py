@@ -1,4 +1,4 @@
-from cannonball import Task
+from cannonball import Node, Task
 
 
 # @pytest.fixture()
@@ -159,6 +159,13 @@ class TestTask:
         assert task.is_blocked is False
         assert task.is_completed is False
 
+    def test_task_with_children_in_init(self):
+        child = Task("Child", completed=True, auto_resolve=False)
+        task = Task("Task", children=[child])
+
+        assert task.children == (child,)
+        assert task.is_completed is True
+
     def test_task_with_completed_children(self):
         task = Task("Task")
         child1 = Task("Child 1", completed=True, parent=task)
@@ -224,6 +231,18 @@ class TestTask:
         task.auto_resolve = True
         assert task.is_completed is True
 
+    def test_enable_auto_resolve_notifies_parent(self):
+        """Test that re-enabling auto_resolve on a completed leaf task propagates to the parent."""
+        parent = Node("Parent")
+        task = Task("Task", parent=parent)
+        assert task.complete() is True
+        assert parent.is_completed is True
+
+        # re-enabling auto-resolve reopens the leaf task, which must propagate to the parent
+        task.auto_resolve = True
+        assert task.is_completed is False
+        assert parent.is_completed is False
+
     def test_task_block_non_leaf(self):
         """Test blocking a non-leaf task."""
         parent = Task("Parent Task")
@@ -3,6 +3,7 @@ from cannonball.utils import (
     walk_list_items,
     extract_node_marker_and_refs,
     extract_str_content,
+    extract_marker_and_content,
 )
 from marko import Markdown
 from marko.block import ListItem
@@ -43,6 +44,19 @@ class TestGetRawTextFromListItem:
         result = get_raw_text_from_listtem(list_item)
         assert result == ""
 
+    def test_get_raw_text_nested_listitem(self):
+        """Test that only the first line is returned for a ListItem with a nested list."""
+        parser = Markdown()
+        markdown = dedent("""\
+        - Parent **item**
+            - Child 1
+            - Child 2
+        """)
+        ast = parser.parse(markdown)
+        list_item = ast.children[0].children[0]
+
+        assert get_raw_text_from_listtem(list_item) == "Parent **item**"
+
 
 class TestWalkListItems:
     def test_walk_list_items_simple(self):
@@ -198,3 +212,43 @@ class TestExtractStrContent:
         text = "- [?] Task 5 [[#^ref123]]"
         content = extract_str_content(text)
         assert content == "Task 5 [[#^ref123]]"
+
+
+class TestExtractMarkerAndContent:
+    def test_extract_marker_and_content_basic(self):
+        """Test extracting marker and content from text with a marker."""
+        marker, content = extract_marker_and_content("[x] Task 1")
+        assert marker == "x"
+        assert content == "Task 1"
+
+    def test_extract_marker_and_content_no_marker(self):
+        """Test extracting marker and content from plain text."""
+        marker, content = extract_marker_and_content("  Plain text  ")
+        assert marker is None
+        assert content == "Plain text"
+
+    def test_extract_marker_and_content_keeps_refs(self):
+        """Test that references remain part of the content."""
+        marker, content = extract_marker_and_content("[?] Question [[#^link1]] ^myref")
+        assert marker == "?"
+        assert content == "Question [[#^link1]] ^myref"
+
+    def test_extract_marker_and_content_matches_separate_extraction(self):
+        """Test that the single scan agrees with the separate extraction functions."""
+        texts = [
+            "[ ] Task",
+            "[!]Blocked",
+            " [D]  Decision  ",
+            "[[#^ref]] Link first",
+            "- Bullet",
+            "-[x] Odd bullet",
+            "[]] Bracket marker",
+            "[ab] Multi character marker",
+            "  [x]No space",
+            "[x]",
+            "[x",
+            "",
+        ]
+        for text in texts:
+            marker, _, _ = extract_node_marker_and_refs(text)
+            assert extract_marker_and_content(text) == (marker, extract_str_content(text))
@@ -0,0 +1,157 @@
+import threading
+import time
+from pathlib import Path
+
+from watchdog.events import FileModifiedEvent
+
+from cannonball.watch import MarkdownWatcher
+
+
+class TestMarkdownWatcher:
+    def test_symlinked_directory(self, tmp_path):
+        """Test that modifications reported through a symlinked directory are matched to the watched file."""
+        directory = tmp_path / "notes"
+        directory.mkdir()
+        (directory / "todo.md").write_text("- [ ] Task\n")
+        link = tmp_path / "link"
+        link.symlink_to(directory)
+
+        calls = []
+        watcher = MarkdownWatcher([link / "todo.md"], lambda w, path: calls.append(path))
+        watcher.on_modified(FileModifiedEvent(str(link / "todo.md")))
+        watcher.on_modified(FileModifiedEvent(str(directory / "todo.md")))
+        assert calls == [(directory / "todo.md").resolve()] * 2
+
+    def test_relative_path(self, tmp_path, monkeypatch):
+        """Test that a watched file registered with a relative path is matched to resolved event paths."""
+        (tmp_path / "todo.md").write_text("- [ ] Task\n")
+        monkeypatch.chdir(tmp_path)
+
+        calls = []
+        watcher = MarkdownWatcher([Path("todo.md")], lambda w, path: calls.append(path))
+        watcher.on_modified(FileModifiedEvent(str((tmp_path / "todo.md").resolve())))
+        watcher.on_modified(FileModifiedEvent("todo.md"))
+        assert calls == [(tmp_path / "todo.md").resolve()] * 2
+
+    def test_debounce_coalesces_modifications(self, tmp_path):
+        """Test that a burst of modifications of a file calls the callback once after the debounce delay."""
+        path = (tmp_path / "todo.md").resolve()
+        path.write_text("- [ ] Task\n")
+        called = threading.Event()
+        calls = []
+
+        def callback(watcher, path):
+            calls.append(path)
+            called.set()
+
+        watcher = MarkdownWatcher([path], callback, debounce=0.05)
+        for _ in range(5):
+            watcher.on_modified(FileModifiedEvent(str(path)))
+        assert calls == []
+
+        assert called.wait(1)
+        time.sleep(0.1)
+        assert calls == [path]
+        assert watcher._pending == {}
+
+    def test_debounce_cancelled_on_stop(self, tmp_path):
+        """Test that stopping the watcher cancels pending debounced callbacks."""
+        path = (tmp_path / "todo.md").resolve()
+        path.write_text("- [ ] Task\n")
+        calls = []
+
+        watcher = MarkdownWatcher([path], lambda w, path: calls.append(path), debounce=0.05)
+        watcher.start()
+        watcher.on_modified(FileModifiedEvent(str(path)))
+        watcher.stop()
+
+        time.sleep(0.1)
+        assert calls == []
+        assert watcher._pending == {}
+
+    def test_debounced_callbacks_do_not_overlap(self, tmp_path):
+        """Test that debounced callbacks of different files are not run concurrently."""
+        paths = [(tmp_path / f"todo{i}.md").resolve() for i in range(3)]
+        for path in paths:
+            path.write_text("- [ ] Task\n")
+        running = []
+        overlaps = []
+        done = threading.Semaphore(0)
+
+        def callback(watcher, path):
+            running.append(path)
+            overlaps.append(len(running))
+            time.sleep(0.02)
+            running.remove(path)
+            done.release()
+
+        watcher = MarkdownWatcher(paths, callback, debounce=0.01)
+        for path in paths:
+            watcher.on_modified(FileModifiedEvent(str(path)))
+        for _ in paths:
+            assert done.acquire(timeout=1)
+        assert overlaps == [1, 1, 1]
+
+    def test_resume_later(self, tmp_path):
+        """Test that a paused file is resumed after the delay."""
+        path = (tmp_path / "todo.md").resolve()
+        path.write_text("- [ ] Task\n")
+
+        watcher = MarkdownWatcher([path], lambda w, path: None)
+        watcher.pause(path)
+        watcher.resume_later(path, delay=0.01)
+        assert path in watcher.paused_files
+
+        time.sleep(0.1)
+        assert path not in watcher.paused_files
+        assert watcher._resume_timers == set()
+
+    def test_resume_later_cancelled_on_stop(self, tmp_path):
+        """Test that stopping the watcher cancels pending resumes, so that a stopped watcher stays paused."""
+        path = (tmp_path / "todo.md").resolve()
+        path.write_text("- [ ] Task\n")
+
+        watcher = MarkdownWatcher([path], lambda w, path: None)
+        watcher.start()
+        watcher.pause(path)
+        watcher.resume_later(path, delay=0.05)
+        watcher.stop()
+
+        time.sleep(0.1)
+        assert path in watcher.paused_files
+        assert watcher._resume_timers == set()
+
+    def test_resume_later_does_not_leak_threads(self, tmp_path):
+        """Test that the threads of expired resume timers finish."""
+        path = (tmp_path / "todo.md").resolve()
+        path.write_text("- [ ] Task\n")
+        threads = threading.active_count()
+
+        watcher = MarkdownWatcher([path], lambda w, path: None)
+        for _ in range(20):
+            watcher.pause(path)
+            watcher.resume_later(path, delay=0.01)
+
+        time.sleep(0.2)
+        assert threading.active_count() == threads
+        assert path not in watcher.paused_files
+
+    def test_modification_on_disk(self, tmp_path):
+        """Test that writing a watched file calls the callback with its resolved path."""
+        path = tmp_path / "todo.md"
+        path.write_text("- [ ] Task\n")
+        called = threading.Event()
+        calls = []
+
+        def callback(watcher, path):
+            calls.append(path)
+            called.set()
+
+        watcher = MarkdownWatcher([path], callback)
+        watcher.start()
+        try:
+            path.write_text("- [x] Task\n")
+            assert called.wait(5)
+        finally:
+            watcher.stop()
+        assert set(calls) == {path.resolve()}